@@ -4,45 +4,288 @@ Iron Lady Course Management System
 A web application with CRUD functionality and AI-powered features
 """
 
+import asyncio
 import os
 import json
+import tempfile
+import threading
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-from dotenv import load_dotenv
-import openai
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response, stream_with_context
+from flask.json.provider import JSONProvider
+from batcher import RequestBatcher
+from chatbot import IronLadyChatbot
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson
+except ImportError:
+    orjson = None  # State files fall back to the stdlib json module
+
+class OrJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster encode/decode"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
 app.secret_key = 'iron-lady-secret-key-2024'
 
+# jsonify and request.get_json go through orjson when it is installed
+if orjson is not None:
+    app.json = OrJSONProvider(app)
+
+def _timestamp() -> str:
+    """Current time formatted for created_at/updated_at fields"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+def _loads(data: bytes):
+    """Deserialize JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+# Fallback suggestions served when no OpenAI client is configured
+DEFAULT_SUGGESTIONS = [
+    "Advanced Leadership Communication",
+    "Digital Transformation for Leaders",
+    "Emotional Intelligence in Leadership",
+    "Strategic Decision Making Workshop"
+]
+
+# Pre-serialized body for the fallback /api/suggestions response, so the
+# static answer skips per-request JSON encoding entirely
+_DEFAULT_SUGGESTIONS_JSON = _dumps({"suggestions": DEFAULT_SUGGESTIONS})
+
+class Course:
+    """A course record with a fixed set of fields.
+
+    __slots__ keeps instances compact (no per-course __dict__), which
+    matters once the catalogue grows beyond the sample data. Templates
+    read the attributes directly; to_dict is the JSON boundary.
+    """
+    __slots__ = ("id", "title", "description", "duration", "format",
+                 "price", "category", "created_at", "updated_at")
+
+    def __init__(self, course_id: int, course_data: Dict, now: str):
+        self.id = course_id
+        self.title = course_data["title"]
+        self.description = course_data["description"]
+        self.duration = course_data["duration"]
+        self.format = course_data["format"]
+        self.price = course_data["price"]
+        self.category = course_data["category"]
+        self.created_at = now
+        self.updated_at = now
+
+    def update(self, course_data: Dict):
+        """Overwrite the editable fields and bump updated_at"""
+        self.title = course_data["title"]
+        self.description = course_data["description"]
+        self.duration = course_data["duration"]
+        self.format = course_data["format"]
+        self.price = course_data["price"]
+        self.category = course_data["category"]
+        self.updated_at = _timestamp()
+
+    def to_dict(self) -> Dict:
+        """Plain-dict view for serialization"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Course":
+        """Rebuild a course from its serialized form"""
+        course = cls(data["id"], data, data["created_at"])
+        course.updated_at = data["updated_at"]
+        return course
+
+class Feedback:
+    """A feedback record with a fixed set of fields.
+
+    Mirrors Course: __slots__ drops the per-entry __dict__, which adds
+    up across the 1000-entry ring buffer, and to_dict/from_dict form
+    the serialization boundary.
+    """
+    __slots__ = ("id", "name", "email", "course", "rating", "feedback",
+                 "created_at")
+
+    def __init__(self, feedback_id: int, feedback_data: Dict, now: str):
+        self.id = feedback_id
+        self.name = feedback_data["name"]
+        self.email = feedback_data["email"]
+        self.course = feedback_data["course"]
+        self.rating = int(feedback_data["rating"])
+        self.feedback = feedback_data["feedback"]
+        self.created_at = now
+
+    def to_dict(self) -> Dict:
+        """Plain-dict view for serialization"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Feedback":
+        """Rebuild a feedback entry from its serialized form"""
+        return cls(data["id"], data, data["created_at"])
+
 class CourseManager:
+    # Above this many feedback entries, summarization goes through the
+    # OpenAI Batch API instead of the realtime endpoint
+    BATCH_FEEDBACK_THRESHOLD = 100
+
+    # Ring-buffer capacity for feedback; the oldest entries drop off
+    # once the buffer is full, keeping memory bounded
+    MAX_FEEDBACK = 1000
+
     def __init__(self):
         """Initialize course manager with sample data"""
         self.courses = {}
-        self.feedback = []
+        self.feedback = deque(maxlen=self.MAX_FEEDBACK)
         self.next_course_id = 1
         self.next_feedback_id = 1
+        self.pending_feedback_batch = None
+        # Bumped on every course mutation; lets views cache rendered
+        # pages and invalidate them only when the catalogue changes
+        self.courses_version = 0
         
-        # Setup OpenAI
-        self.openai_client = None
-        self.setup_openai()
-        
-        # Load sample data
-        self.load_sample_data()
+        # The OpenAI clients are created lazily by the openai_client /
+        # async_client properties, so building the manager at import
+        # time does not pay for client setup or .env parsing
+        self._openai_client = None
+        self._async_client = None
+        self._openai_ready = False
+
+        # Batches concurrent chat completions into one dispatch cycle
+        self._batcher = RequestBatcher(self._send_chat_request)
+
+        # Load persisted state; fall back to sample data on first run
+        self.data_file = os.getenv('COURSE_DATA_FILE', 'course_data.json')
+        # Serializes saves: concurrent request threads must not write
+        # the state file over each other
+        self._save_lock = threading.Lock()
+        if not self.load_state():
+            self.load_sample_data()
 
     def setup_openai(self):
-        """Setup OpenAI client"""
+        """Setup OpenAI clients"""
+        # dotenv and openai are imported here, on first AI call, so
+        # module import (and process cold start) never pays for them
+        from dotenv import load_dotenv
+        load_dotenv()
+
         api_key = os.getenv('OPENAI_API_KEY')
         if api_key:
             try:
-                self.openai_client = openai.OpenAI(api_key=api_key)
+                import openai
+                self._openai_client = openai.OpenAI(api_key=api_key)
+                self._async_client = openai.AsyncOpenAI(api_key=api_key)
                 print("✅ OpenAI API connected for course management!")
             except Exception as e:
                 print(f"⚠️ OpenAI setup failed: {e}")
-                self.openai_client = None
+                self._openai_client = None
+                self._async_client = None
+        self._openai_ready = True
+
+    @property
+    def openai_client(self):
+        """Sync OpenAI client, created on first use"""
+        if not self._openai_ready:
+            self.setup_openai()
+        return self._openai_client
+
+    @property
+    def async_client(self):
+        """Async OpenAI client, created on first use"""
+        if not self._openai_ready:
+            self.setup_openai()
+        return self._async_client
+
+    async def _send_chat_request(self, request: Dict):
+        """Send one chat completion; called by the batcher per batch entry"""
+        return await self.async_client.chat.completions.create(**request)
+
+    def save_state(self):
+        """Persist courses and feedback to the state file"""
+        # One save at a time, each through its own temp file: concurrent
+        # writers sharing a fixed tmp path can interleave their writes,
+        # and os.replace would then promote a torn file
+        with self._save_lock:
+            state = {
+                "courses": [course.to_dict() for course in self.courses.values()],
+                "feedback": [feedback.to_dict() for feedback in self.feedback],
+                "next_course_id": self.next_course_id,
+                "next_feedback_id": self.next_feedback_id,
+                "pending_feedback_batch": self.pending_feedback_batch
+            }
+
+            try:
+                fd, tmp_file = tempfile.mkstemp(
+                    dir=os.path.dirname(self.data_file) or ".",
+                    prefix=os.path.basename(self.data_file) + "."
+                )
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(_dumps(state))
+                    os.replace(tmp_file, self.data_file)  # atomic swap
+                except BaseException:
+                    os.unlink(tmp_file)
+                    raise
+            except Exception as e:
+                print(f"⚠️ Failed to save state: {e}")
+
+    def load_state(self) -> bool:
+        """Restore courses and feedback from the state file, if present"""
+        if not os.path.exists(self.data_file):
+            return False
+
+        try:
+            with open(self.data_file, "rb") as f:
+                state = _loads(f.read())
+
+            # Parse everything into locals first: if any part of the file
+            # is malformed, self keeps its pristine state and the sample
+            # data loads on top of a clean slate instead of a half-import
+            courses = {
+                course["id"]: Course.from_dict(course)
+                for course in state["courses"]
+            }
+            feedback = deque(
+                (Feedback.from_dict(entry) for entry in state["feedback"]),
+                maxlen=self.MAX_FEEDBACK
+            )
+            next_course_id = state["next_course_id"]
+            next_feedback_id = state["next_feedback_id"]
+            # .get: state files from before batch support lack this field
+            pending_feedback_batch = state.get("pending_feedback_batch")
+
+        except Exception as e:
+            print(f"⚠️ Failed to load state: {e}")
+            # Move the unreadable file aside: the sample-data fallback
+            # saves on its first add_course, which would otherwise
+            # overwrite the operator's only copy of their data
+            try:
+                corrupt_file = self.data_file + ".corrupt"
+                os.replace(self.data_file, corrupt_file)
+                print(f"⚠️ Moved unreadable state file to {corrupt_file}")
+            except OSError as move_error:
+                print(f"⚠️ Could not move state file aside: {move_error}")
+            return False
+
+        self.courses = courses
+        self.feedback = feedback
+        self.next_course_id = next_course_id
+        self.next_feedback_id = next_feedback_id
+        self.pending_feedback_batch = pending_feedback_batch
+        return True
 
     def load_sample_data(self):
         """Load sample courses"""
@@ -79,40 +322,27 @@ class CourseManager:
     def add_course(self, course_data: Dict) -> int:
         """Add a new course"""
         course_id = self.next_course_id
-        self.courses[course_id] = {
-            "id": course_id,
-            "title": course_data["title"],
-            "description": course_data["description"],
-            "duration": course_data["duration"],
-            "format": course_data["format"],
-            "price": course_data["price"],
-            "category": course_data["category"],
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        self.courses[course_id] = Course(course_id, course_data, _timestamp())
         self.next_course_id += 1
+        self.courses_version += 1
+        self.save_state()
         return course_id
 
-    def get_course(self, course_id: int) -> Optional[Dict]:
+    def get_course(self, course_id: int) -> Optional[Course]:
         """Get a course by ID"""
         return self.courses.get(course_id)
 
-    def get_all_courses(self) -> List[Dict]:
+    def get_all_courses(self) -> List[Course]:
         """Get all courses"""
         return list(self.courses.values())
 
     def update_course(self, course_id: int, course_data: Dict) -> bool:
         """Update a course"""
-        if course_id in self.courses:
-            self.courses[course_id].update({
-                "title": course_data["title"],
-                "description": course_data["description"],
-                "duration": course_data["duration"],
-                "format": course_data["format"],
-                "price": course_data["price"],
-                "category": course_data["category"],
-                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
+        course = self.courses.get(course_id)
+        if course is not None:
+            course.update(course_data)
+            self.courses_version += 1
+            self.save_state()
             return True
         return False
 
@@ -120,91 +350,289 @@ class CourseManager:
         """Delete a course"""
         if course_id in self.courses:
             del self.courses[course_id]
+            self.courses_version += 1
+            self.save_state()
             return True
         return False
 
     def add_feedback(self, feedback_data: Dict) -> int:
         """Add student feedback"""
         feedback_id = self.next_feedback_id
-        feedback = {
-            "id": feedback_id,
-            "name": feedback_data["name"],
-            "email": feedback_data["email"],
-            "course": feedback_data["course"],
-            "rating": int(feedback_data["rating"]),
-            "feedback": feedback_data["feedback"],
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.feedback.append(feedback)
+        self.feedback.append(Feedback(feedback_id, feedback_data, _timestamp()))
         self.next_feedback_id += 1
+        self.save_state()
         return feedback_id
 
-    def get_all_feedback(self) -> List[Dict]:
+    def get_all_feedback(self) -> List[Feedback]:
         """Get all feedback"""
-        return self.feedback
+        return list(self.feedback)
+
+    @staticmethod
+    def _suggestion_prompt(category: str = "") -> str:
+        """Build the prompt for course suggestions"""
+        return f"""Generate 4 creative course title suggestions for Iron Lady Leadership Programs.
+            Focus on women's leadership development and empowerment.
+            {f'Category focus: {category}' if category else ''}
+
+            Return only the course titles, one per line."""
+
+    @staticmethod
+    def _parse_suggestions(content: str) -> List[str]:
+        """Parse suggestion titles out of a model response"""
+        suggestions = content.strip().split('\n')
+        return [s.strip('- ').strip() for s in suggestions if s.strip()]
+
+    @staticmethod
+    def _summary_prompt(feedback_chunk: Iterable[Feedback]) -> str:
+        """Build the prompt for summarizing a chunk of feedback"""
+        feedback_text = "\n".join(
+            f"Rating: {f.rating}/5 - {f.feedback}"
+            for f in feedback_chunk
+        )
+
+        return f"""Summarize the following student feedback for Iron Lady Leadership Programs.
+            Provide key insights, common themes, and overall sentiment:
+
+            {feedback_text}"""
 
     def generate_course_suggestions(self, category: str = "") -> List[str]:
         """AI-powered course suggestions"""
         if not self.openai_client:
-            return [
-                "Advanced Leadership Communication",
-                "Digital Transformation for Leaders", 
-                "Emotional Intelligence in Leadership",
-                "Strategic Decision Making Workshop"
-            ]
-        
+            return DEFAULT_SUGGESTIONS
+
         try:
-            prompt = f"""Generate 4 creative course title suggestions for Iron Lady Leadership Programs.
-            Focus on women's leadership development and empowerment.
-            {f'Category focus: {category}' if category else ''}
-            
-            Return only the course titles, one per line."""
-            
             response = self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
+                messages=[{"role": "user", "content": self._suggestion_prompt(category)}],
                 max_tokens=150,
                 temperature=0.8
             )
-            
-            suggestions = response.choices[0].message.content.strip().split('\n')
-            return [s.strip('- ').strip() for s in suggestions if s.strip()]
-            
+
+            return self._parse_suggestions(response.choices[0].message.content)
+
+        except Exception as e:
+            print(f"AI suggestion error: {e}")
+            return ["Advanced Leadership Communication", "Digital Transformation for Leaders"]
+
+    async def generate_course_suggestions_async(self, category: str = "") -> List[str]:
+        """Async variant of generate_course_suggestions for async routes"""
+        if not self.async_client:
+            return DEFAULT_SUGGESTIONS
+
+        try:
+            response = await self._batcher.submit({
+                "model": "gpt-3.5-turbo",
+                "messages": [{"role": "user", "content": self._suggestion_prompt(category)}],
+                "max_tokens": 150,
+                "temperature": 0.8
+            })
+
+            return self._parse_suggestions(response.choices[0].message.content)
+
         except Exception as e:
             print(f"AI suggestion error: {e}")
             return ["Advanced Leadership Communication", "Digital Transformation for Leaders"]
 
+    def submit_feedback_batch(self) -> Optional[str]:
+        """Submit all feedback for summarization via the OpenAI Batch API
+
+        Builds a JSONL file with one chat-completion request per chunk of
+        10 feedback entries, uploads it and creates a 24h batch. Batch
+        processing costs half the realtime price and draws on a separate
+        rate-limit pool, so it is the right fit for nightly digests and
+        bulk runs over historical feedback.
+        """
+        if not self.feedback or not self.openai_client:
+            return None
+
+        try:
+            feedback = list(self.feedback)
+            chunks = [feedback[i:i + 10] for i in range(0, len(feedback), 10)]
+
+            lines = []
+            for i, chunk in enumerate(chunks):
+                lines.append(json.dumps({
+                    "custom_id": f"feedback-chunk-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": "gpt-3.5-turbo",
+                        "messages": [{"role": "user", "content": self._summary_prompt(chunk)}],
+                        "max_tokens": 200,
+                        "temperature": 0.5
+                    }
+                }))
+
+            batch_file = self.openai_client.files.create(
+                file=("feedback_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+
+            self.pending_feedback_batch = batch.id
+            self.save_state()  # survive restarts while the batch runs
+            return batch.id
+
+        except Exception as e:
+            print(f"Batch submission error: {e}")
+            return None
+
+    def check_feedback_batch(self) -> Optional[str]:
+        """Poll the pending feedback batch and reduce results when done
+
+        Returns the final summary if the batch completed, otherwise None.
+        Intended to be called from a scheduled task after
+        submit_feedback_batch.
+        """
+        if not self.pending_feedback_batch or not self.openai_client:
+            return None
+
+        try:
+            batch = self.openai_client.batches.retrieve(self.pending_feedback_batch)
+            if batch.status != "completed":
+                if batch.status in ("failed", "expired", "cancelled"):
+                    print(f"Feedback batch {batch.id} ended with status: {batch.status}")
+                    self.pending_feedback_batch = None
+                    self.save_state()
+                return None
+
+            content = self.openai_client.files.content(batch.output_file_id).text
+            partials = [
+                json.loads(line)["response"]["body"]["choices"][0]["message"]["content"].strip()
+                for line in content.splitlines() if line.strip()
+            ]
+            self.pending_feedback_batch = None
+            self.save_state()
+
+            if len(partials) == 1:
+                return partials[0]
+
+            # Reduce the partial summaries into one final summary
+            combined = "\n\n".join(partials)
+            prompt = f"""Combine the following partial summaries of student feedback
+            for Iron Lady Leadership Programs into one concise overall summary:
+
+            {combined}"""
+
+            response = self.openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=200,
+                temperature=0.5
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            print(f"Batch retrieval error: {e}")
+            return None
+
     def summarize_feedback(self) -> str:
         """AI-powered feedback summary"""
         if not self.feedback or not self.openai_client:
             return "No feedback available for summary."
-        
+
+        # Large backlogs are too slow for an interactive call; hand them
+        # to the Batch API and let check_feedback_batch pick up the result.
+        if len(self.feedback) > self.BATCH_FEEDBACK_THRESHOLD:
+            batch_id = self.submit_feedback_batch()
+            if batch_id:
+                return f"Feedback batch {batch_id} submitted for summarization. Check back later for the summary."
+
         try:
-            feedback_text = "\n".join([
-                f"Rating: {f['rating']}/5 - {f['feedback']}" 
-                for f in self.feedback[-10:]  # Last 10 feedback
-            ])
-            
-            prompt = f"""Summarize the following student feedback for Iron Lady Leadership Programs.
-            Provide key insights, common themes, and overall sentiment:
-            
-            {feedback_text}"""
-            
+            # Last 10 feedback, iterated in place - no full-deque copy
+            recent = islice(self.feedback, max(len(self.feedback) - 10, 0), None)
+            prompt = self._summary_prompt(recent)
+
             response = self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=200,
                 temperature=0.5
             )
-            
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            print(f"AI summary error: {e}")
+            return "Unable to generate feedback summary at this time."
+
+    async def _summarize_chunk_async(self, feedback_chunk: List[Dict]) -> str:
+        """Summarize one chunk of feedback"""
+        response = await self._batcher.submit({
+            "model": "gpt-3.5-turbo",
+            "messages": [{"role": "user", "content": self._summary_prompt(feedback_chunk)}],
+            "max_tokens": 200,
+            "temperature": 0.5
+        })
+
+        return response.choices[0].message.content.strip()
+
+    async def summarize_feedback_async(self) -> str:
+        """AI-powered feedback summary over all feedback, chunked in parallel"""
+        if not self.feedback or not self.async_client:
+            return "No feedback available for summary."
+
+        # A batch submitted earlier (possibly before a restart) takes
+        # precedence: poll it and serve its summary once it completes
+        if self.pending_feedback_batch:
+            summary = await asyncio.to_thread(self.check_feedback_batch)
+            if summary:
+                return summary
+            if self.pending_feedback_batch:
+                return (f"Feedback batch {self.pending_feedback_batch} is still "
+                        "processing. Check back later for the summary.")
+
+        # Large backlogs are too slow and costly for the realtime
+        # endpoint; hand them to the Batch API instead
+        if len(self.feedback) > self.BATCH_FEEDBACK_THRESHOLD:
+            batch_id = await asyncio.to_thread(self.submit_feedback_batch)
+            if batch_id:
+                return (f"Feedback batch {batch_id} submitted for summarization. "
+                        "Check back later for the summary.")
+
+        try:
+            feedback = list(self.feedback)
+            chunks = [feedback[i:i + 10] for i in range(0, len(feedback), 10)]
+
+            # Fan the chunk summaries out so the model calls overlap
+            partials = await asyncio.gather(
+                *[self._summarize_chunk_async(chunk) for chunk in chunks]
+            )
+
+            if len(partials) == 1:
+                return partials[0]
+
+            # Reduce the partial summaries into one final summary
+            combined = "\n\n".join(partials)
+            prompt = f"""Combine the following partial summaries of student feedback
+            for Iron Lady Leadership Programs into one concise overall summary:
+
+            {combined}"""
+
+            response = await self.async_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=200,
+                temperature=0.5
+            )
+
             return response.choices[0].message.content.strip()
-            
+
         except Exception as e:
             print(f"AI summary error: {e}")
             return "Unable to generate feedback summary at this time."
 
-# Initialize course manager
+# Initialize course manager and chatbot once at startup.
+# The OpenAI client is thread-safe, and the chatbot's response caches
+# take their own lock, so a single chatbot instance can be shared
+# across requests under a threaded server.
 course_manager = CourseManager()
+chatbot_instance = IronLadyChatbot()
 
 # Routes
 @app.route('/')
@@ -213,11 +641,29 @@ def index():
     courses = course_manager.get_all_courses()
     return render_template('index.html', courses=courses)
 
+# Rendered /courses page, valid while courses_version is unchanged
+_courses_page_cache = {"version": None, "html": None}
+_courses_page_lock = threading.Lock()
+
 @app.route('/courses')
 def courses():
     """Course management page"""
-    courses = course_manager.get_all_courses()
-    return render_template('courses.html', courses=courses)
+    # Flash messages are consumed during rendering and differ per
+    # visitor, so requests with pending flashes bypass the cache.
+    if session.get('_flashes'):
+        return render_template('courses.html', courses=course_manager.get_all_courses())
+
+    # Capture the version before rendering so a catalogue change made
+    # mid-render invalidates the page instead of being attached to it
+    version = course_manager.courses_version
+    with _courses_page_lock:
+        if _courses_page_cache["version"] == version:
+            return _courses_page_cache["html"]
+    html = render_template('courses.html', courses=course_manager.get_all_courses())
+    with _courses_page_lock:
+        _courses_page_cache["html"] = html
+        _courses_page_cache["version"] = version
+    return html
 
 @app.route('/course/add', methods=['GET', 'POST'])
 def add_course():
@@ -267,7 +713,7 @@ def delete_course(course_id):
     """Delete course"""
     course = course_manager.get_course(course_id)
     if course and course_manager.delete_course(course_id):
-        flash(f'Course "{course["title"]}" deleted successfully!', 'success')
+        flash(f'Course "{course.title}" deleted successfully!', 'success')
     else:
         flash('Failed to delete course!', 'error')
     return redirect(url_for('courses'))
@@ -292,16 +738,21 @@ def feedback():
     return render_template('feedback.html', courses=courses, feedback=all_feedback)
 
 @app.route('/api/suggestions')
-def api_suggestions():
+async def api_suggestions():
     """API endpoint for course suggestions"""
+    # Without an AI client the answer is always the static default list;
+    # serve the pre-serialized bytes instead of re-encoding per request
+    if not course_manager.async_client:
+        return app.response_class(_DEFAULT_SUGGESTIONS_JSON, mimetype='application/json')
+
     category = request.args.get('category', '')
-    suggestions = course_manager.generate_course_suggestions(category)
+    suggestions = await course_manager.generate_course_suggestions_async(category)
     return jsonify({"suggestions": suggestions})
 
 @app.route('/api/feedback-summary')
-def api_feedback_summary():
+async def api_feedback_summary():
     """API endpoint for feedback summary"""
-    summary = course_manager.summarize_feedback()
+    summary = await course_manager.summarize_feedback_async()
     return jsonify({"summary": summary})
 
 @app.route('/chatbot')
@@ -310,17 +761,25 @@ def chatbot_page():
     return render_template('chatbot.html')
 
 @app.route('/api/chat', methods=['POST'])
-def api_chat():
+async def api_chat():
     """API endpoint for chatbot"""
-    from chatbot import IronLadyChatbot
-    
     data = request.get_json()
     user_message = data.get('message', '')
-    
-    chatbot = IronLadyChatbot()
-    response = chatbot.get_response(user_message)
+
+    response = await chatbot_instance.get_response_async(user_message)
     
     return jsonify({"response": response})
 
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    """Streaming chat endpoint: sends plain-text chunks as they arrive"""
+    data = request.get_json()
+    user_message = data.get('message', '')
+
+    return Response(
+        stream_with_context(chatbot_instance.stream_response(user_message)),
+        mimetype='text/plain'
+    )
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Request batching for OpenAI API calls
+Coalesces concurrent requests into one dispatch cycle
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable
+
+
+class RequestBatcher:
+    """Coalesces concurrent API requests into batched dispatches.
+
+    Callers submit a request payload and await the result. Each event
+    loop gets its own queue and drain worker, created under a lock, so
+    threaded servers running one loop per thread (e.g. Flask async
+    views via asgiref) cannot stomp each other's state. The worker
+    takes whatever has been queued in the same scheduling tick and
+    dispatches the batch in one asyncio.gather, so concurrent callers
+    on a loop - such as fanned-out feedback chunks - share a single
+    dispatch cycle. There is deliberately no timed collection window:
+    a wait would add its full length to every lone request, and across
+    separate per-request loops nothing can coalesce anyway.
+    """
+
+    def __init__(self, send: Callable[[Any], Awaitable[Any]],
+                 max_batch_size: int = 8):
+        self._send = send
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._queues = {}  # event loop -> queue with a live drain worker
+
+    def _queue_for_current_loop(self) -> asyncio.Queue:
+        """Get the current loop's queue, starting its worker if needed"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                # Drop entries for loops that have since been closed
+                # (per-request loops), so the registry stays bounded
+                for stale in [l for l in self._queues if l.is_closed()]:
+                    del self._queues[stale]
+
+                queue = asyncio.Queue()
+                self._queues[loop] = queue
+                loop.create_task(self._drain(queue))
+            return queue
+
+    async def submit(self, request: Any) -> Any:
+        """Queue a request and wait for its result"""
+        queue = self._queue_for_current_loop()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((request, future))
+        return await future
+
+    async def _drain(self, queue: asyncio.Queue):
+        """Per-loop worker: send batches and resolve caller futures"""
+        while True:
+            batch = [await queue.get()]
+
+            # Yield once so submitters scheduled in the same tick can
+            # enqueue, then take whatever is ready
+            await asyncio.sleep(0)
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            results = await asyncio.gather(
+                *[self._send(request) for request, _ in batch],
+                return_exceptions=True
+            )
+
+            for (_, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -4,23 +4,27 @@ Iron Lady Leadership Programs Chatbot
 A simple FAQ chatbot with AI-powered enhancements using OpenAI API
 """
 
+import asyncio
 import os
 import json
+import string
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional
-from dotenv import load_dotenv
-import openai
 
-# Load environment variables
-load_dotenv()
+from batcher import RequestBatcher
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Semantic response cache is disabled without numpy
+
+# Translation table for stripping punctuation during cache normalization
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
 
 class IronLadyChatbot:
-    def __init__(self):
-        """Initialize the chatbot with FAQ data and OpenAI client"""
-        self.openai_client = None
-        self.setup_openai()
-        
-        # Iron Lady FAQ Database
-        self.faq_data = {
+    # Iron Lady FAQ Database (class-level so it is built once, not per instance)
+    faq_data = {
             "programs": {
                 "question": "What programs does Iron Lady offer?",
                 "answer": """Iron Lady offers comprehensive leadership programs including:
@@ -87,38 +91,110 @@ Mentor-to-participant ratio is maintained at 1:8 for personalized attention.
 Each participant is assigned a dedicated mentor based on their career goals."""
             }
         }
-        
-        # Keywords for intent recognition
-        self.keywords = {
-            "programs": ["program", "course", "offer", "available", "what", "services"],
-            "duration": ["duration", "time", "long", "period", "months", "weeks"],
-            "format": ["online", "offline", "mode", "format", "where", "location"],
-            "certificates": ["certificate", "certification", "credential", "badge"],
-            "mentors": ["mentor", "coach", "teacher", "instructor", "guide", "expert"]
-        }
+
+    # Keywords for intent recognition (class-level so it is built once, not per instance)
+    keywords = {
+        "programs": ["program", "course", "offer", "available", "what", "services"],
+        "duration": ["duration", "time", "long", "period", "months", "weeks"],
+        "format": ["online", "offline", "mode", "format", "where", "location"],
+        "certificates": ["certificate", "certification", "credential", "badge"],
+        "mentors": ["mentor", "coach", "teacher", "instructor", "guide", "expert"]
+    }
+
+    # Keyword token sets per intent, built once at class creation with
+    # simple plural variants so "programs" still matches "program".
+    # find_intent intersects these with the tokenized input: O(1) per
+    # token instead of scanning the message per keyword, and whole-word
+    # matching stops false hits like "long" inside "belong"
+    _intent_tokens = [
+        (intent,
+         frozenset(variant for keyword in intent_keywords
+                   for variant in (keyword, keyword + "s", keyword + "es")))
+        for intent, intent_keywords in keywords.items()
+    ]
+
+    # Minimum cosine similarity for a semantic cache hit
+    SEMANTIC_CACHE_THRESHOLD = 0.92
+    SEMANTIC_CACHE_SIZE = 512
+    EXACT_CACHE_SIZE = 512
+
+    def __init__(self):
+        """Initialize the chatbot"""
+        # The OpenAI clients are created lazily by the openai_client /
+        # async_client properties, so constructing the chatbot (which
+        # happens at module import) does not pay for client setup or
+        # .env parsing until the first AI call
+        self._openai_client = None
+        self._async_client = None
+        self._openai_ready = False
+
+        # Batches concurrent chat completions into one dispatch cycle
+        self._batcher = RequestBatcher(self._send_chat_request)
+
+        # Exact-match response cache: normalized input -> response (LRU)
+        self._exact_cache = OrderedDict()
+        # Semantic response cache: list of (embedding, response) pairs
+        self._emb_cache = []
+        # Guards both caches: the shared instance serves every thread of
+        # a threaded server, and an unguarded move_to_end can race an
+        # eviction into a KeyError
+        self._cache_lock = threading.Lock()
+
+    async def _send_chat_request(self, request: Dict):
+        """Send one chat completion; called by the batcher per batch entry"""
+        return await self.async_client.chat.completions.create(**request)
 
     def setup_openai(self):
-        """Setup OpenAI client if API key is available"""
+        """Setup OpenAI clients if an API key is available"""
+        # dotenv and openai are imported here, on first AI call, so
+        # module import (and process cold start) never pays for them
+        from dotenv import load_dotenv
+        load_dotenv()
+
         api_key = os.getenv('OPENAI_API_KEY')
         if api_key:
             try:
-                self.openai_client = openai.OpenAI(api_key=api_key)
+                import openai
+                self._openai_client = openai.OpenAI(api_key=api_key)
+                self._async_client = openai.AsyncOpenAI(api_key=api_key)
                 print("✅ OpenAI API connected successfully!")
             except Exception as e:
                 print(f"⚠️ OpenAI setup failed: {e}")
-                self.openai_client = None
+                self._openai_client = None
+                self._async_client = None
         else:
             print("⚠️ No OpenAI API key found. Using basic FAQ responses only.")
+        self._openai_ready = True
 
-    def find_intent(self, user_input: str) -> Optional[str]:
-        """Find the most likely intent based on keywords"""
-        user_input_lower = user_input.lower()
-        
-        # Direct keyword matching
-        for intent, keywords in self.keywords.items():
-            if any(keyword in user_input_lower for keyword in keywords):
+    @property
+    def openai_client(self):
+        """Sync OpenAI client, created on first use"""
+        if not self._openai_ready:
+            self.setup_openai()
+        return self._openai_client
+
+    @property
+    def async_client(self):
+        """Async OpenAI client, created on first use"""
+        if not self._openai_ready:
+            self.setup_openai()
+        return self._async_client
+
+    def find_intent(self, normalized_input: str) -> Optional[str]:
+        """Find the most likely intent based on keywords
+
+        Expects input already lowercased via normalize_input; the
+        response paths normalize once and reuse the result for the
+        cache lookups and intent matching.
+        """
+        tokens = set(normalized_input.split())
+
+        # Intents are checked in declaration order, matching the old
+        # keyword loop's precedence
+        for intent, keyword_tokens in self._intent_tokens:
+            if tokens & keyword_tokens:
                 return intent
-        
+
         return None
 
     def get_faq_response(self, intent: str) -> str:
@@ -127,68 +203,334 @@ Each participant is assigned a dedicated mentor based on their career goals."""
             return self.faq_data[intent]["answer"]
         return None
 
+    SYSTEM_PROMPT = """You are a helpful assistant for Iron Lady Leadership Programs.
+        You should provide accurate, encouraging, and professional responses about leadership development.
+        Keep responses concise but informative. Always maintain a supportive and empowering tone.
+
+        Available Programs Context:
+        - Executive Leadership Development (6 months)
+        - Women in Leadership Bootcamp (3 months)
+        - Corporate Mentorship Program (4 months)
+        - Leadership Skills Workshop (2 months)
+        - Personal Branding Program (3 months)
+        - Strategic Thinking Course (2 months)
+
+        All programs are hybrid (70% online, 30% offline) with expert mentors and certificates provided."""
+
+    # Specialized system messages, built once per distinct FAQ context.
+    # The possible contexts are just the handful of FAQ answers, so every
+    # chat call after the first reuses a prebuilt message dict instead of
+    # re-concatenating the prompt.
+    _system_messages = {"": {"role": "system", "content": SYSTEM_PROMPT}}
+
+    def _build_system_message(self, context: str = "") -> Dict:
+        """System message for a chat call, specialized per FAQ context"""
+        message = self._system_messages.get(context)
+        if message is None:
+            message = {
+                "role": "system",
+                "content": f"{self.SYSTEM_PROMPT}\n\nRelevant FAQ Context: {context}"
+            }
+            self._system_messages[context] = message
+        return message
+
     def get_ai_response(self, user_input: str, context: str = "") -> Optional[str]:
         """Get AI-powered response using OpenAI"""
         if not self.openai_client:
             return None
-        
+
         try:
-            system_prompt = """You are a helpful assistant for Iron Lady Leadership Programs. 
-            You should provide accurate, encouraging, and professional responses about leadership development.
-            Keep responses concise but informative. Always maintain a supportive and empowering tone.
-            
-            Available Programs Context:
-            - Executive Leadership Development (6 months)
-            - Women in Leadership Bootcamp (3 months) 
-            - Corporate Mentorship Program (4 months)
-            - Leadership Skills Workshop (2 months)
-            - Personal Branding Program (3 months)
-            - Strategic Thinking Course (2 months)
-            
-            All programs are hybrid (70% online, 30% offline) with expert mentors and certificates provided."""
-            
-            if context:
-                system_prompt += f"\n\nRelevant FAQ Context: {context}"
-            
             response = self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    self._build_system_message(context),
                     {"role": "user", "content": user_input}
                 ],
                 max_tokens=300,
                 temperature=0.7
             )
-            
+
             return response.choices[0].message.content.strip()
-        
+
         except Exception as e:
             print(f"AI response error: {e}")
             return None
 
+    def stream_ai_response(self, user_input: str, context: str = ""):
+        """Yield AI response text deltas as the model generates them
+
+        Errors propagate to the caller so a stream that dies midway is
+        distinguishable from one that completed; stream_response uses
+        that to keep truncated answers out of the caches.
+        """
+        if not self.openai_client:
+            return
+
+        stream = self.openai_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                self._build_system_message(context),
+                {"role": "user", "content": user_input}
+            ],
+            max_tokens=300,
+            temperature=0.7,
+            stream=True
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def get_ai_response_async(self, user_input: str, context: str = "") -> Optional[str]:
+        """Get AI-powered response using OpenAI without blocking the event loop"""
+        if not self.async_client:
+            return None
+
+        import openai  # already in sys.modules once a client exists
+
+        # Retry rate-limit errors with a short backoff; other failures
+        # fall through to the FAQ/default response like the sync path.
+        for attempt in range(3):
+            try:
+                response = await self._batcher.submit({
+                    "model": "gpt-3.5-turbo",
+                    "messages": [
+                        self._build_system_message(context),
+                        {"role": "user", "content": user_input}
+                    ],
+                    "max_tokens": 300,
+                    "temperature": 0.7
+                })
+
+                return response.choices[0].message.content.strip()
+
+            except openai.RateLimitError as e:
+                if attempt == 2:
+                    print(f"AI response error: {e}")
+                    return None
+                await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                print(f"AI response error: {e}")
+                return None
+
+    @staticmethod
+    def normalize_input(user_input: str) -> str:
+        """Normalize user input for cache lookups (lowercase, no punctuation)"""
+        return ' '.join(user_input.lower().translate(_PUNCT_TABLE).split())
+
+    def get_embedding(self, text: str) -> Optional["np.ndarray"]:
+        """Get an embedding vector for semantic cache lookups"""
+        if not self.openai_client or np is None:
+            return None
+
+        try:
+            result = self.openai_client.embeddings.create(
+                model="text-embedding-3-small",
+                input=text
+            )
+            return np.array(result.data[0].embedding)
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            return None
+
+    async def get_embedding_async(self, text: str) -> Optional["np.ndarray"]:
+        """Get an embedding vector without blocking the event loop"""
+        if not self.async_client or np is None:
+            return None
+
+        try:
+            result = await self.async_client.embeddings.create(
+                model="text-embedding-3-small",
+                input=text
+            )
+            return np.array(result.data[0].embedding)
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            return None
+
+    def _semantic_cache_lookup(self, embedding) -> Optional[str]:
+        """Return a cached response whose question is close enough to the input"""
+        if embedding is None:
+            return None
+
+        # Snapshot the entries under the lock; the matmul runs outside it
+        with self._cache_lock:
+            if not self._emb_cache:
+                return None
+            entries = list(self._emb_cache)
+
+        # OpenAI embeddings are unit-normalized, so a dot product is
+        # the cosine similarity; one matmul scores the whole cache.
+        matrix = np.stack([vec for vec, _ in entries])
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.SEMANTIC_CACHE_THRESHOLD:
+            return entries[best][1]
+        return None
+
+    def _semantic_cache_insert(self, embedding, response: str):
+        """Store a response in the semantic cache, evicting the oldest entry"""
+        if embedding is None:
+            return
+        with self._cache_lock:
+            self._emb_cache.append((embedding, response))
+            if len(self._emb_cache) > self.SEMANTIC_CACHE_SIZE:
+                self._emb_cache.pop(0)
+
+    def _exact_cache_get(self, normalized_input: str) -> Optional[str]:
+        """Look up a response in the exact-match LRU cache"""
+        with self._cache_lock:
+            response = self._exact_cache.get(normalized_input)
+            if response is not None:
+                self._exact_cache.move_to_end(normalized_input)
+            return response
+
+    def _exact_cache_insert(self, normalized_input: str, response: str):
+        """Store a response in the exact-match cache, evicting the oldest entry"""
+        with self._cache_lock:
+            self._exact_cache[normalized_input] = response
+            self._exact_cache.move_to_end(normalized_input)
+            if len(self._exact_cache) > self.EXACT_CACHE_SIZE:
+                self._exact_cache.popitem(last=False)
+
     def get_response(self, user_input: str) -> str:
         """Main method to get chatbot response"""
         if not user_input.strip():
             return "Please ask me something about Iron Lady's leadership programs!"
-        
+
+        # Exact-match tier: repeated questions are answered from the LRU
+        # cache without touching the OpenAI API.
+        normalized_input = self.normalize_input(user_input)
+        response = self._exact_cache_get(normalized_input)
+        if response is None:
+            response, cacheable = self._resolve_response(user_input, normalized_input)
+            if cacheable:
+                self._exact_cache_insert(normalized_input, response)
+        return response
+
+    async def get_response_async(self, user_input: str) -> str:
+        """Async variant of get_response for use from async web routes"""
+        if not user_input.strip():
+            return "Please ask me something about Iron Lady's leadership programs!"
+
+        normalized_input = self.normalize_input(user_input)
+        response = self._exact_cache_get(normalized_input)
+        if response is None:
+            response, cacheable = await self._resolve_response_async(user_input, normalized_input)
+            if cacheable:
+                self._exact_cache_insert(normalized_input, response)
+        return response
+
+    def stream_response(self, user_input: str):
+        """Yield response text incrementally for the streaming endpoint
+
+        Cache hits and FAQ fallbacks arrive as a single chunk; live AI
+        responses are yielded delta by delta and inserted into both
+        cache tiers once complete.
+        """
+        if not user_input.strip():
+            yield "Please ask me something about Iron Lady's leadership programs!"
+            return
+
+        normalized_input = self.normalize_input(user_input)
+        cached = self._exact_cache_get(normalized_input)
+        if cached is not None:
+            yield cached
+            return
+
+        intent = self.find_intent(normalized_input)
+        faq_response = self.get_faq_response(intent) if intent else None
+
+        embedding = self.get_embedding(user_input)
+        semantic = self._semantic_cache_lookup(embedding)
+        if semantic:
+            self._exact_cache_insert(normalized_input, semantic)
+            yield semantic
+            return
+
+        parts = []
+        try:
+            for delta in self.stream_ai_response(user_input, faq_response or ""):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            # The truncated text has already been streamed to this
+            # client, but it must not be cached and replayed to others
+            print(f"AI response error: {e}")
+            return
+
+        if parts:
+            response = "".join(parts).strip()
+            self._semantic_cache_insert(embedding, response)
+        else:
+            response = self._choose_response(None, faq_response)
+            yield response
+            if not faq_response:
+                # Help-text fallback may reflect a transient API
+                # failure; don't let it shadow future answers
+                return
+        self._exact_cache_insert(normalized_input, response)
+
+    def _resolve_response(self, user_input: str, normalized_input: str):
+        """Resolve a message to a (response, cacheable) pair
+
+        The normalized form is only a key for intent matching and the
+        caches; the raw message goes to the model and embeddings so
+        punctuation and casing reach the prompt intact. cacheable is
+        False when the help-text fallback was chosen, since that can
+        mask a transient API failure and must not be replayed after
+        the API recovers.
+        """
         # Find intent
-        intent = self.find_intent(user_input)
-        
+        intent = self.find_intent(normalized_input)
+
         # Get FAQ response if intent found
         faq_response = None
         if intent:
             faq_response = self.get_faq_response(intent)
-        
+
+        # Semantic tier: near-duplicate questions reuse an earlier answer
+        embedding = self.get_embedding(user_input)
+        ai_response = self._semantic_cache_lookup(embedding)
+
         # Try AI response for more natural interaction
-        ai_response = self.get_ai_response(user_input, faq_response or "")
-        
+        if not ai_response:
+            ai_response = self.get_ai_response(user_input, faq_response or "")
+            if ai_response:
+                self._semantic_cache_insert(embedding, ai_response)
+
+        response = self._choose_response(ai_response, faq_response)
+        return response, bool(ai_response or faq_response)
+
+    async def _resolve_response_async(self, user_input: str, normalized_input: str):
+        """Async variant of _resolve_response"""
+        intent = self.find_intent(normalized_input)
+
+        faq_response = None
+        if intent:
+            faq_response = self.get_faq_response(intent)
+
+        embedding = await self.get_embedding_async(user_input)
+        ai_response = self._semantic_cache_lookup(embedding)
+
+        if not ai_response:
+            ai_response = await self.get_ai_response_async(user_input, faq_response or "")
+            if ai_response:
+                self._semantic_cache_insert(embedding, ai_response)
+
+        response = self._choose_response(ai_response, faq_response)
+        return response, bool(ai_response or faq_response)
+
+    @staticmethod
+    def _choose_response(ai_response: Optional[str], faq_response: Optional[str]) -> str:
+        """Pick the best available response, falling back to the help text"""
         # Return AI response if available, otherwise FAQ response
         if ai_response:
             return ai_response
         elif faq_response:
             return faq_response
         else:
-            return """I'd be happy to help you learn about Iron Lady's leadership programs! 
+            return """I'd be happy to help you learn about Iron Lady's leadership programs!
 
 You can ask me about:
 • What programs are offered
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Optional Cython build for the hot modules
+Run: python setup.py build_ext --inplace
+
+Compiles chatbot.py and batcher.py to C extensions for faster intent
+matching, cache lookups and request batching. The app runs unchanged
+as pure Python when Cython is not installed or the build is skipped.
+"""
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    raise SystemExit(
+        "Cython is not installed; the app runs as pure Python without this build.\n"
+        "Install it with: pip install cython"
+    )
+
+setup(
+    name="iron-lady-course-app",
+    ext_modules=cythonize(
+        ["chatbot.py", "batcher.py"],
+        language_level="3"
+    ),
+)